@@ -6,19 +6,100 @@ Script for downloading wallpapers from the internet, cropping them for two scree
 
 import json
 import os
+import queue
 import random
+import struct
 import subprocess
 import sys
+import tempfile
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Union
+from urllib.parse import urlparse
 
 import requests
-from PIL import Image
+import requests_cache
+from PIL import Image, ImageFile, features
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 
-def load_config(config_path: str = "config.json") -> dict:
-    """Loads configuration from a JSON file."""
+def create_session() -> requests.Session:
+    """
+    Creates an HTTP session with connection pooling and retries, shared by all downloads.
+    
+    Search results from Pexels and Reddit are cached on disk for an hour,
+    image downloads are never cached.
+    """
+    session = requests_cache.CachedSession(
+        cache_name=str(Path(__file__).parent / ".http_cache"),
+        backend="sqlite",
+        expire_after=requests_cache.DO_NOT_CACHE,
+        urls_expire_after={
+            "api.pexels.com/v1/search": 3600,
+            "www.reddit.com/r/*/top.json": 3600,
+        },
+        allowable_codes=(200,),
+        allowable_methods=("GET",)
+    )
+    session.headers.update({
+        "User-Agent": "WallpaperDownloader/1.0 (by /u/wallpaperbot)"
+    })
+    
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=32,
+        # Read timeouts are not retried, a stalled server would otherwise block for several timeouts
+        max_retries=Retry(total=2, read=0, backoff_factor=0.3)
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    
+    return session
+
+
+SESSION = create_session()
+
+# Official Pillow wheels bundle libjpeg-turbo, custom builds may not
+if not features.check_feature("libjpeg_turbo"):
+    print("Hint: Pillow is not built with libjpeg-turbo, JPEG decoding and encoding will be slower "
+          "(the official Pillow wheels include it)")
+
+# Number of Reddit candidate images downloaded in parallel
+REDDIT_PROBE_BATCH_SIZE = 8
+
+# Extensions of direct image links in Reddit posts
+IMAGE_EXTENSIONS = frozenset({".jpg", ".jpeg", ".png", ".webp"})
+
+# Amount of data read from a Reddit candidate image to find its dimensions
+MAX_IMAGE_HEADER_SIZE = 64 * 1024
+
+
+@dataclass(slots=True)
+class Config:
+    """Script settings from config.json with their default values."""
+    test_mode: bool = False
+    test_image: str = ""
+    source_mode: str = "pexels"  # "pexels" or "reddit"
+    pexels_api_key: str = ""
+    theme: str = "black and white minimalist"
+    min_width: int = 1920
+    min_height: int = 1695
+    orientation: str = "landscape"
+    exe_path: str = ""
+    output_dir: str = "./temp"
+    upper_width: int = 1920
+    upper_height: int = 1080
+    lower_width: int = 1920
+    lower_height: int = 515
+    offset_px: int = 100
+
+
+def load_config(config_path: str = "config.json") -> Config:
+    """Loads configuration from a JSON file, unknown keys are ignored."""
     script_dir = Path(__file__).parent
     config_file = script_dir / config_path
     
@@ -28,10 +109,11 @@ def load_config(config_path: str = "config.json") -> dict:
     with open(config_file, 'r', encoding='utf-8') as f:
         config = json.load(f)
     
-    return config
+    known_keys = {field.name for field in fields(Config)}
+    return Config(**{key: value for key, value in config.items() if key in known_keys})
 
 
-def download_wallpaper_from_pexels(api_key: str, theme: str, min_width: int, min_height: int, orientation: str = "landscape") -> Optional[bytes]:
+def download_wallpaper_from_pexels(api_key: str, theme: str, min_width: int, min_height: int, orientation: str = "landscape") -> Optional[str]:
     """
     Downloads wallpapers via Pexels API by the specified theme.
     
@@ -43,7 +125,7 @@ def download_wallpaper_from_pexels(api_key: str, theme: str, min_width: int, min
         orientation: Image orientation (landscape, portrait, square)
     
     Returns:
-        Image bytes or None in case of error
+        Path to the downloaded temporary image file or None in case of error
     """
     if not api_key:
         print("Pexels API key not specified, skipping Pexels...")
@@ -59,12 +141,14 @@ def download_wallpaper_from_pexels(api_key: str, theme: str, min_width: int, min
         "per_page": 20,
         "orientation": orientation,
         "size": "large",
-        "page": random.randint(1, 10)  # Случайная страница для большего разнообразия
+        # Rotate through the first 10 pages once per hour, matching the search cache lifetime,
+        # so repeated runs within the hour reuse the cached page; the photo is still picked randomly
+        "page": int(time.time() // 3600) % 10 + 1
     }
     
     try:
         print(f"Searching for wallpapers by theme: {theme}...")
-        response = requests.get(search_url, headers=headers, params=params, timeout=10)
+        response = SESSION.get(search_url, headers=headers, params=params, timeout=10)
         response.raise_for_status()
         
         data = response.json()
@@ -92,17 +176,184 @@ def download_wallpaper_from_pexels(api_key: str, theme: str, min_width: int, min
         # Randomly select one image from suitable ones
         selected_url, selected_width, selected_height = random.choice(suitable_photos)
         print(f"Downloading randomly selected image: {selected_width}x{selected_height}...")
-        img_response = requests.get(selected_url, timeout=30)
-        img_response.raise_for_status()
-        
-        return img_response.content
+        with SESSION.get(selected_url, timeout=30, stream=True) as img_response:
+            img_response.raise_for_status()
+            
+            # Stream the image to a temporary file instead of keeping it in memory
+            tmp_file = tempfile.NamedTemporaryFile(suffix=".img", delete=False)
+            try:
+                with tmp_file:
+                    for chunk in img_response.iter_content(chunk_size=64 * 1024):
+                        tmp_file.write(chunk)
+            except Exception:
+                os.remove(tmp_file.name)
+                raise
+        
+        return tmp_file.name
         
     except requests.exceptions.RequestException as e:
         print(f"Error downloading wallpapers from Pexels: {e}")
         return None
 
 
-def download_wallpaper_from_reddit(theme: str, min_width: int, min_height: int) -> Optional[bytes]:
+def get_image_dimensions(data: bytes) -> Optional[Tuple[int, int]]:
+    """
+    Reads image dimensions from the header of a JPEG, PNG or WebP file without decoding it.
+    
+    Args:
+        data: Beginning of the image file
+    
+    Returns:
+        Tuple (width, height) or None if the format is not supported or the header is incomplete
+    """
+    # PNG: signature followed by the IHDR chunk with width and height
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        if len(data) >= 24 and data[12:16] == b"IHDR":
+            width, height = struct.unpack(">II", data[16:24])
+            return width, height
+        return None
+    
+    # JPEG: walk the segments after SOI up to the first SOF (start of frame) segment
+    if data.startswith(b"\xff\xd8"):
+        offset = 2
+        while offset + 4 <= len(data):
+            if data[offset] != 0xFF:
+                return None
+            marker = data[offset + 1]
+            if marker == 0xFF:
+                # Fill byte before a marker
+                offset += 1
+                continue
+            if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+                # Markers without a segment
+                offset += 2
+                continue
+            
+            # SOF0-SOF15, except DHT (C4), JPG (C8) and DAC (CC) which share the range
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                if offset + 9 > len(data):
+                    return None
+                height, width = struct.unpack(">HH", data[offset + 5:offset + 9])
+                return width, height
+            
+            segment_length = struct.unpack(">H", data[offset + 2:offset + 4])[0]
+            offset += 2 + segment_length
+        return None
+    
+    # WebP: RIFF container with a lossy (VP8), lossless (VP8L) or extended (VP8X) first chunk
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP" and len(data) >= 30:
+        chunk_type = data[12:16]
+        if chunk_type == b"VP8 ":
+            width, height = struct.unpack("<HH", data[26:30])
+            return width & 0x3FFF, height & 0x3FFF
+        if chunk_type == b"VP8L":
+            bits = struct.unpack("<I", data[21:25])[0]
+            return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if chunk_type == b"VP8X":
+            width = int.from_bytes(data[24:27], "little") + 1
+            height = int.from_bytes(data[27:30], "little") + 1
+            return width, height
+    
+    return None
+
+
+def download_reddit_candidate(
+    image_url: str,
+    min_width: int,
+    min_height: int,
+    stop_event: Optional[threading.Event] = None
+) -> Optional[str]:
+    """
+    Downloads a candidate image from Reddit and checks its dimensions.
+    
+    Args:
+        image_url: Image URL
+        min_width: Minimum image width
+        min_height: Minimum image height
+        stop_event: Event that aborts the download when set
+    
+    Returns:
+        Path to the downloaded temporary image file or None if the image is too small or failed to download
+    """
+    try:
+        print(f"Downloading: {image_url[:60]}...")
+        with SESSION.get(image_url, timeout=30, stream=True) as img_response:
+            img_response.raise_for_status()
+            
+            # Read only the first chunks until the image dimensions can be read from the header
+            header = bytearray()
+            dimensions = None
+            chunks = img_response.iter_content(chunk_size=8 * 1024)
+            for chunk in chunks:
+                if stop_event is not None and stop_event.is_set():
+                    return None
+                header += chunk
+                dimensions = get_image_dimensions(header)
+                if dimensions is not None or len(header) >= MAX_IMAGE_HEADER_SIZE:
+                    break
+            
+            if dimensions is None:
+                # Other formats (e.g. GIF) or very large metadata, let PIL find the dimensions
+                parser = ImageFile.Parser()
+                parser.feed(bytes(header))
+                if parser.image is None:
+                    for chunk in chunks:
+                        if stop_event is not None and stop_event.is_set():
+                            return None
+                        header += chunk
+                        parser.feed(chunk)
+                        if parser.image is not None:
+                            break
+                
+                if parser.image is None:
+                    return None
+                dimensions = parser.image.size
+            
+            # Check image dimensions, too small images are dropped without downloading the rest
+            img_width, img_height = dimensions
+            if img_width < min_width or img_height < min_height:
+                print(f"Image too small ({img_width}x{img_height}), trying next...")
+                return None
+            
+            if stop_event is not None and stop_event.is_set():
+                return None
+            
+            # The image is large enough, stream it to a temporary file instead of keeping it in memory
+            tmp_file = tempfile.NamedTemporaryFile(suffix=".img", delete=False)
+            completed = False
+            try:
+                with tmp_file:
+                    tmp_file.write(header)
+                    for chunk in chunks:
+                        if stop_event is not None and stop_event.is_set():
+                            return None
+                        tmp_file.write(chunk)
+                completed = True
+            finally:
+                if not completed:
+                    os.remove(tmp_file.name)
+        
+        print(f"Successfully downloaded {img_width}x{img_height} image from Reddit")
+        return tmp_file.name
+        
+    except Exception:
+        pass
+    
+    return None
+
+
+def probe_reddit_candidate(
+    results: queue.Queue,
+    image_url: str,
+    min_width: int,
+    min_height: int,
+    stop_event: threading.Event
+) -> None:
+    """Downloads a Reddit candidate image on a worker thread and puts the result into the queue."""
+    results.put(download_reddit_candidate(image_url, min_width, min_height, stop_event))
+
+
+def download_wallpaper_from_reddit(theme: str, min_width: int, min_height: int) -> Optional[str]:
     """
     Downloads a random wallpaper from popular Reddit wallpaper subreddits.
     
@@ -112,20 +363,17 @@ def download_wallpaper_from_reddit(theme: str, min_width: int, min_height: int)
         min_height: Minimum image height
     
     Returns:
-        Image bytes or None in case of error
+        Path to the downloaded temporary image file or None in case of error
     """
+    # Aborts the remaining candidate downloads once one of them succeeds
+    stop_event = threading.Event()
+    
     # Popular wallpaper subreddits
     subreddits = ["wallpaper", "wallpapers", "MinimalWallpaper", "EarthPorn", "SpacePorn", 
                   "CityPorn", "SkyPorn", "WaterPorn", "AbandonedPorn"]
     
-    headers = {
-        "User-Agent": "WallpaperDownloader/1.0 (by /u/wallpaperbot)"
-    }
-    
     # Try subreddits in random order
-    random.shuffle(subreddits)
-    
-    for subreddit in subreddits:
+    for subreddit in random.sample(subreddits, k=len(subreddits)):
         try:
             print(f"Downloading from Reddit r/{subreddit}...")
             
@@ -133,7 +381,7 @@ def download_wallpaper_from_reddit(theme: str, min_width: int, min_height: int)
             url = f"https://www.reddit.com/r/{subreddit}/top.json"
             params = {"limit": 100, "t": "month"}
             
-            response = requests.get(url, headers=headers, params=params, timeout=10)
+            response = SESSION.get(url, params=params, timeout=10)
             response.raise_for_status()
             
             posts = response.json().get("data", {}).get("children", [])
@@ -147,7 +395,7 @@ def download_wallpaper_from_reddit(theme: str, min_width: int, min_height: int)
                 url_overridden = post_data.get("url_overridden_by_dest", "")
                 
                 # Check if it's a direct image link
-                if url_overridden and any(ext in url_overridden.lower() for ext in [".jpg", ".jpeg", ".png", ".webp"]):
+                if url_overridden and os.path.splitext(urlparse(url_overridden).path)[1].lower() in IMAGE_EXTENSIONS:
                     image_urls.append(url_overridden)
                 # Or try to get from preview
                 elif post_data.get("preview"):
@@ -160,27 +408,28 @@ def download_wallpaper_from_reddit(theme: str, min_width: int, min_height: int)
             if not image_urls:
                 continue
             
-            # Randomly select and download an image
-            random.shuffle(image_urls)
-            for image_url in image_urls[:20]:  # Try up to 20 images
-                try:
-                    print(f"Downloading: {image_url[:60]}...")
-                    img_response = requests.get(image_url, headers=headers, timeout=30)
-                    img_response.raise_for_status()
-                    
-                    # Check image dimensions
-                    from io import BytesIO
-                    img = Image.open(BytesIO(img_response.content))
-                    img_width, img_height = img.size
-                    
-                    if img_width >= min_width and img_height >= min_height:
-                        print(f"Successfully downloaded {img_width}x{img_height} image from Reddit")
-                        return img_response.content
-                    else:
-                        print(f"Image too small ({img_width}x{img_height}), trying next...")
-                        
-                except Exception as e:
-                    continue
+            # Randomly select images and download them in parallel batches
+            candidate_urls = random.sample(image_urls, k=min(20, len(image_urls)))  # Try up to 20 images
+            
+            for start in range(0, len(candidate_urls), REDDIT_PROBE_BATCH_SIZE):
+                batch = candidate_urls[start:start + REDDIT_PROBE_BATCH_SIZE]
+                
+                # Daemon threads, so that downloads still waiting for a response
+                # don't keep the script running after a winner is found
+                results = queue.Queue()
+                for image_url in batch:
+                    threading.Thread(
+                        target=probe_reddit_candidate,
+                        args=(results, image_url, min_width, min_height, stop_event),
+                        daemon=True
+                    ).start()
+                
+                # Take the first image that is large enough
+                for _ in batch:
+                    image_path = results.get()
+                    if image_path:
+                        stop_event.set()
+                        return image_path
             
         except Exception as e:
             print(f"Error with r/{subreddit}: {e}, trying next...")
@@ -203,27 +452,23 @@ def load_local_image(image_path: str) -> Optional[bytes]:
     script_dir = Path(__file__).parent
     parent_dir = script_dir.parent
     
-    # Try to find the file in the parent directory
-    local_path = parent_dir / image_path
-    if not local_path.exists():
-        local_path = script_dir / image_path
-    if not local_path.exists():
-        local_path = Path(image_path)
-    
-    if not local_path.exists():
-        print(f"Local file not found: {image_path}")
-        return None
+    # Try to find the file in the parent directory, then in the script directory,
+    # then as given. Reading directly avoids a separate existence check per path
+    for local_path in (parent_dir / image_path, script_dir / image_path, Path(image_path)):
+        try:
+            return local_path.read_bytes()
+        except FileNotFoundError:
+            continue
+        except Exception as e:
+            print(f"Error reading local file: {e}")
+            return None
     
-    try:
-        with open(local_path, 'rb') as f:
-            return f.read()
-    except Exception as e:
-        print(f"Error reading local file: {e}")
-        return None
+    print(f"Local file not found: {image_path}")
+    return None
 
 
 def process_image(
-    image_data: bytes,
+    image_data: Union[bytes, str],
     output_dir: str,
     upper_width: int,
     upper_height: int,
@@ -236,7 +481,7 @@ def process_image(
     crops it for two screens, and saves the files.
     
     Args:
-        image_data: Image bytes
+        image_data: Image bytes or path to an image file
         output_dir: Directory for saving cropped images
         upper_width: Upper screen width
         upper_height: Upper screen height
@@ -248,9 +493,26 @@ def process_image(
         Tuple (path_to_upper_file, path_to_lower_file) or (None, None) on error
     """
     try:
+        # Calculate required dimensions
+        required_width = max(upper_width, lower_width)
+        required_height = upper_height + offset_px + lower_height
+        
         # Load the image
-        from io import BytesIO
-        image = Image.open(BytesIO(image_data))
+        if isinstance(image_data, str):
+            image = Image.open(image_data)
+        else:
+            from io import BytesIO
+            image = Image.open(BytesIO(image_data))
+        
+        source_size = image.size
+        print(f"Original image resolution: {source_size[0]}x{source_size[1]}")
+        
+        # Let libjpeg downscale large JPEGs during decoding (by 1/2, 1/4 or 1/8)
+        # while keeping the image at least as large as the required area
+        if image.format == "JPEG":
+            image.draft("RGB", (required_width, required_height))
+            if image.size != source_size:
+                print(f"Decoding at reduced resolution: {image.size[0]}x{image.size[1]}")
         
         # Convert to RGB if necessary (handles palette mode, RGBA, etc.)
         if image.mode != 'RGB':
@@ -276,14 +538,9 @@ def process_image(
                 # Convert other modes (like CMYK, L, etc.) to RGB
                 image = image.convert('RGB')
         
+        # Decoded size, smaller than the original if JPEG draft mode was applied
         original_width, original_height = image.size
         
-        print(f"Original image resolution: {original_width}x{original_height}")
-        
-        # Calculate required dimensions
-        required_width = max(upper_width, lower_width)
-        required_height = upper_height + offset_px + lower_height
-
         # Scale the image in "cover" mode - so it covers the required area
         # Use the minimum coefficient so the image fits exactly
         scale_factor_width = required_width / original_width
@@ -297,31 +554,47 @@ def process_image(
 
         if scale_factor != 1.0:
             print(f"Scaling to: {new_width}x{new_height} (coefficient: {scale_factor:.3f})")
-            image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-
-        current_width, current_height = image.size
 
         # Calculate offset for centering
-        horizontal_offset = max(0, (current_width - required_width) // 2)
-        vertical_offset = max(0, (current_height - required_height) // 2)
+        horizontal_offset = max(0, (new_width - required_width) // 2)
+        vertical_offset = max(0, (new_height - required_height) // 2)
 
         print(f"Centering: offset ({horizontal_offset}, {vertical_offset})")
 
-        # Crop the upper part (with centering)
+        # Upper part area in the scaled image (with centering)
         upper_left = horizontal_offset
         upper_top = vertical_offset
         upper_right = upper_left + upper_width
         upper_bottom = upper_top + upper_height
+        upper_box = (upper_left, upper_top, upper_right, upper_bottom)
 
-        upper_crop = image.crop((upper_left, upper_top, upper_right, upper_bottom))
-
-        # Crop the lower part (with offset and centering)
+        # Lower part area in the scaled image (with offset and centering)
         lower_left = horizontal_offset
         lower_top = vertical_offset + upper_height + offset_px
         lower_right = lower_left + lower_width
         lower_bottom = lower_top + lower_height
+        lower_box = (lower_left, lower_top, lower_right, lower_bottom)
 
-        lower_crop = image.crop((lower_left, lower_top, lower_right, lower_bottom))
+        if scale_factor != 1.0:
+            # Resample each screen's area directly from the source image instead of
+            # scaling the whole image and cropping it afterwards.
+            # With reducing_gap, large downscales first shrink the area with fast
+            # box averaging, so that LANCZOS only has to process a much smaller image
+            upper_crop = image.resize(
+                (upper_width, upper_height),
+                Image.Resampling.LANCZOS,
+                box=tuple(coord / scale_factor for coord in upper_box),
+                reducing_gap=3.0
+            )
+            lower_crop = image.resize(
+                (lower_width, lower_height),
+                Image.Resampling.LANCZOS,
+                box=tuple(coord / scale_factor for coord in lower_box),
+                reducing_gap=3.0
+            )
+        else:
+            upper_crop = image.crop(upper_box)
+            lower_crop = image.crop(lower_box)
         
         # Create directory for output files
         script_dir = Path(__file__).parent
@@ -332,8 +605,15 @@ def process_image(
         upper_file = output_path / "wallpaper_upper.jpg"
         lower_file = output_path / "wallpaper_lower.jpg"
         
-        upper_crop.save(upper_file, "JPEG", quality=95)
-        lower_crop.save(lower_file, "JPEG", quality=95)
+        # Optimized Huffman tables and progressive scans give smaller files at the cost of slower encoding
+        save_options = {"quality": 95, "optimize": True, "progressive": True}
+        
+        # Encode both files in parallel, libjpeg releases the GIL while encoding
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            upper_future = executor.submit(upper_crop.save, upper_file, "JPEG", **save_options)
+            lower_future = executor.submit(lower_crop.save, lower_file, "JPEG", **save_options)
+            upper_future.result()
+            lower_future.result()
         
         print(f"Upper screen saved: {upper_file} ({upper_crop.size[0]}x{upper_crop.size[1]})")
         print(f"Lower screen saved: {lower_file} ({lower_crop.size[0]}x{lower_crop.size[1]})")
@@ -357,18 +637,6 @@ def apply_wallpaper(exe_path: str, upper_file: str, lower_file: str) -> bool:
     Returns:
         True if successful, False in case of error
     """
-    if not os.path.exists(exe_path):
-        print(f"Error: WallpaperChanger.exe not found: {exe_path}")
-        return False
-    
-    if not os.path.exists(upper_file):
-        print(f"Error: upper screen file not found: {upper_file}")
-        return False
-    
-    if not os.path.exists(lower_file):
-        print(f"Error: lower screen file not found: {lower_file}")
-        return False
-    
     try:
         # Apply wallpaper to upper screen (monitor 0)
         print(f"Applying wallpaper to upper screen (monitor 0)...")
@@ -383,7 +651,8 @@ def apply_wallpaper(exe_path: str, upper_file: str, lower_file: str) -> bool:
             print(f"Error applying wallpaper to upper screen: {result1.stderr}")
             return False
         
-        # Delay between applying wallpapers
+        # Delay between applying wallpapers: WallpaperChanger keeps the state of all
+        # monitors in its storage, so concurrent runs could overwrite each other
         time.sleep(1)
         
         # Apply wallpaper to lower screen (monitor 1)
@@ -402,6 +671,9 @@ def apply_wallpaper(exe_path: str, upper_file: str, lower_file: str) -> bool:
         print("Wallpapers successfully applied to both screens!")
         return True
         
+    except FileNotFoundError:
+        print(f"Error: WallpaperChanger.exe not found: {exe_path}")
+        return False
     except subprocess.TimeoutExpired:
         print("Error: timeout while applying wallpapers")
         return False
@@ -412,59 +684,43 @@ def apply_wallpaper(exe_path: str, upper_file: str, lower_file: str) -> bool:
 
 def main():
     """Main script function."""
+    image_data = None
+    
     try:
         # Load configuration
         config = load_config()
         
-        # Get parameters from configuration
-        test_mode = config.get("test_mode", False)
-        test_image = config.get("test_image", "")
-        source_mode = config.get("source_mode", "pexels").lower()  # "pexels" or "reddit"
-        pexels_api_key = config.get("pexels_api_key", "")
-        theme = config.get("theme", "black and white minimalist")
-        min_width = config.get("min_width", 1920)
-        min_height = config.get("min_height", 1695)
-        orientation = config.get("orientation", "landscape")
-        exe_path = config.get("exe_path", "")
-        output_dir = config.get("output_dir", "./temp")
-        upper_width = config.get("upper_width", 1920)
-        upper_height = config.get("upper_height", 1080)
-        lower_width = config.get("lower_width", 1920)
-        lower_height = config.get("lower_height", 515)
-        offset_px = config.get("offset_px", 100)
-        
         # Load image
-        image_data = None
-        
-        if test_mode:
+        if config.test_mode:
             print("Test mode: loading local image...")
-            if not test_image:
+            if not config.test_image:
                 print("Error: test image path not specified")
                 return 1
             
-            # Try to find the file in the parent directory
-            script_dir = Path(__file__).parent
-            parent_dir = script_dir.parent
-            test_path = parent_dir / test_image
-            
-            image_data = load_local_image(str(test_path) if test_path.exists() else test_image)
+            image_data = load_local_image(config.test_image)
         else:
-            if source_mode == "reddit":
+            if config.source_mode.lower() == "reddit":
                 # Direct Reddit mode - no Pexels attempt
                 print("Source mode: Reddit")
-                image_data = download_wallpaper_from_reddit(theme, min_width, min_height)
+                image_data = download_wallpaper_from_reddit(config.theme, config.min_width, config.min_height)
             else:
                 # Pexels mode: try Pexels first, fallback to Reddit
                 print("Source mode: Pexels (with Reddit fallback)")
                 image_data = None
-                if pexels_api_key:
+                if config.pexels_api_key:
                     print("Attempting to download from Pexels...")
-                    image_data = download_wallpaper_from_pexels(pexels_api_key, theme, min_width, min_height, orientation)
+                    image_data = download_wallpaper_from_pexels(
+                        config.pexels_api_key,
+                        config.theme,
+                        config.min_width,
+                        config.min_height,
+                        config.orientation
+                    )
                 
                 # Fallback to Reddit if Pexels failed or API key not set
                 if not image_data:
                     print("Falling back to Reddit...")
-                    image_data = download_wallpaper_from_reddit(theme, min_width, min_height)
+                    image_data = download_wallpaper_from_reddit(config.theme, config.min_width, config.min_height)
         
         if not image_data:
             print("Failed to load image from all sources")
@@ -473,12 +729,12 @@ def main():
         # Process image
         upper_file, lower_file = process_image(
             image_data,
-            output_dir,
-            upper_width,
-            upper_height,
-            lower_width,
-            lower_height,
-            offset_px
+            config.output_dir,
+            config.upper_width,
+            config.upper_height,
+            config.lower_width,
+            config.lower_height,
+            config.offset_px
         )
         
         if not upper_file or not lower_file:
@@ -486,7 +742,7 @@ def main():
             return 1
         
         # Apply wallpapers
-        if not apply_wallpaper(exe_path, upper_file, lower_file):
+        if not apply_wallpaper(config.exe_path, upper_file, lower_file):
             print("Failed to apply wallpapers")
             return 1
         
@@ -500,6 +756,13 @@ def main():
         import traceback
         traceback.print_exc()
         return 1
+    finally:
+        # Remove the temporary file of a downloaded image
+        if isinstance(image_data, str):
+            try:
+                os.remove(image_data)
+            except OSError:
+                pass
 
 
 if __name__ == "__main__":